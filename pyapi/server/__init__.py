@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
 from functools import wraps
 from http import HTTPStatus
 from importlib import import_module
@@ -14,15 +16,33 @@ from typing import cast
 from urllib.parse import urlsplit
 
 from jsonschema_path import SchemaPath
-from openapi_core import validate_request, validate_response
 from openapi_core.exceptions import OpenAPIError
 from openapi_core.security.exceptions import SecurityProviderError
+from openapi_core.validation.request.protocols import RequestValidator
 from starlette.applications import Starlette
 from starlette.exceptions import HTTPException
+from starlette.routing import BaseRoute, Route
 from stringcase import snakecase
 
-from .spec import OperationSpec, get_spec_from_file
-from .validation import JSONResponse, OpenAPIRequest, OpenAPIResponse, Request, Response
+from .batch import execute_batch
+from .profiling import RequestProfiler
+from .rejection import REJECTION_DETAILS, Rejections
+from .security import (
+    CredentialCache,
+    SecurityHandler,
+    SecurityHandlers,
+    get_credential_locations,
+)
+from .spec import OperationSpec, get_spec_fingerprint, get_spec_from_file
+from .tracing import NULL_TRACE, NullTrace, Trace, Tracer
+from .validation import (
+    JSONResponse,
+    OpenAPIRequest,
+    OpenAPIResponse,
+    Request,
+    Response,
+    SpecValidators,
+)
 
 log = getLogger(__name__)
 
@@ -43,9 +63,27 @@ class Application(Starlette):
                                   If a sequence of strings, the responses to corresponding
                                   operations will not be validated.
         spec_url: The URL of the OpenAPI specification, if needed.
+        security_handlers: A mapping of `securitySchemes` names to (optionally async)
+                           functions that verify the credentials of the corresponding scheme.
+        security_cache: Cache for the results of security handlers; if omitted, results are
+                        cached using the default TTLs of `CredentialCache`.
+        batch_path: If set, adds a `POST` route at this path which executes a list of
+                    operation requests concurrently and returns their results.
+        batch_concurrency: Maximum number of batched requests executed at the same time.
+        batch_max_items: Maximum number of requests in a batch; larger batches are rejected
+                         with the status 413.
+        profiler: If set, selected requests are profiled using this profiler.
+        tracer: If set, the handling of each request is traced using this tracer.
+        spool_threshold: If set, multipart and binary request bodies larger than this size
+                         in bytes, or of unknown length, are streamed instead of being read
+                         into memory (see `OpenAPIRequest.load_body`); by default, all request
+                         bodies are read into memory.
+        rejections: Builds the responses to invalid requests and counts them per operation;
+                    if omitted, the defaults of `Rejections` are used. In debug mode,
+                    validation errors are logged and raised as HTTP errors instead.
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         spec: SchemaPath | dict,
         *,
@@ -54,45 +92,96 @@ class Application(Starlette):
         custom_format_validators: Mapping[str, Callable] | None = None,
         skip_response_validation: Sequence[str] | bool = False,
         spec_url: str = "",
+        security_handlers: Mapping[str, SecurityHandler] | None = None,
+        security_cache: CredentialCache | None = None,
+        batch_path: str | None = None,
+        batch_concurrency: int = 10,
+        batch_max_items: int = 100,
+        profiler: RequestProfiler | None = None,
+        tracer: Tracer | None = None,
+        spool_threshold: int | None = None,
+        rejections: Rejections | None = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
         if isinstance(spec, dict):
             spec = SchemaPath.from_dict(spec, base_uri=spec_url)
-        self.spec: SchemaPath = spec
         self.enforce_case = enforce_case
         self.custom_format_validators = custom_format_validators
         self.skip_response_validation = skip_response_validation
+        self.profiler = profiler
+        self.tracer = tracer
+        self.spool_threshold = spool_threshold
+        self.rejections = rejections if rejections is not None else Rejections()
+
+        self.security_handlers: SecurityHandlers | None = None
+        if security_handlers:
+            self.security_handlers = SecurityHandlers(
+                _get_security_schemes(spec), security_handlers, security_cache
+            )
+        self._set_spec(self._compile_spec(spec))
+        self.batch_concurrency = batch_concurrency
+        self.batch_max_items = batch_max_items
+        if batch_path is not None:
+            self.add_route(batch_path, self._execute_batch, ["POST"], name="batch")
+
+        self._endpoints: dict[str, tuple[str, Callable]] = {}
+        self._operation_routes: dict[str, list[BaseRoute]] = {}
+        self._module = _load_module(module) if isinstance(module, str) else module
+        if self._module is not None:
+            for operation_id in self._operations:
+                self.set_endpoint(self._find_endpoint(operation_id), operation_id=operation_id)
 
-        self._operations = OperationSpec.get_all(self.spec)
-        self._server_paths = {urlsplit(server["url"]).path for server in self.spec["servers"]}
-
-        if module is not None:
-            if isinstance(module, str):
-                module = _load_module(module)
+    def _compile_spec(self, spec: SchemaPath) -> _CompiledSpec:
+        """
+        Builds the state derived from the spec, without changing the application.
 
-            for operation_id in self._operations:
-                name = operation_id
-                if "." in name:
-                    base, name = name.rsplit(".", 1)
-                    base_module = _load_module(f"{module.__name__}.{base}")
-                else:
-                    base_module = module
-                if self.enforce_case:
-                    name = snakecase(name)
-                try:
-                    endpoint_fn = getattr(base_module, name)
-                except AttributeError as ex:
-                    message = f"The function `{base_module.__name__}.{name}` does not exist!"
-                    raise RuntimeError(message) from ex
-                self.set_endpoint(endpoint_fn, operation_id=operation_id)
+        Doesn't touch the event loop, so it can be called from another thread.
+        """
+        security_handlers = self.security_handlers
+        if security_handlers is not None:
+            security_handlers = SecurityHandlers(
+                _get_security_schemes(spec), security_handlers.handlers, security_handlers.cache
+            )
+        return _CompiledSpec(
+            spec=spec,
+            validators=SpecValidators(spec, self.custom_format_validators),
+            operations=OperationSpec.get_all(spec),
+            server_paths={urlsplit(server["url"]).path for server in spec["servers"]},
+            security_handlers=security_handlers,
+        )
+
+    def _set_spec(self, compiled: _CompiledSpec) -> None:
+        """Sets the spec and the state derived from it."""
+        self.spec: SchemaPath = compiled.spec
+        self._validators = compiled.validators
+        self._operations = compiled.operations
+        self._server_paths = compiled.server_paths
+        self.security_handlers = compiled.security_handlers
+
+    def _find_endpoint(self, operation_id: str) -> Callable:
+        """Finds the endpoint function for the operation in the endpoints module."""
+        module = cast(ModuleType, self._module)
+        name = operation_id
+        if "." in name:
+            base, name = name.rsplit(".", 1)
+            base_module = _load_module(f"{module.__name__}.{base}")
+        else:
+            base_module = module
+        if self.enforce_case:
+            name = snakecase(name)
+        try:
+            return getattr(base_module, name)
+        except AttributeError as ex:
+            message = f"The function `{base_module.__name__}.{name}` does not exist!"
+            raise RuntimeError(message) from ex
 
     def _to_validate_response_for(self, operation_id: str) -> bool:
         if not isinstance(self.skip_response_validation, bool):
             return operation_id in self.skip_response_validation
         return not self.skip_response_validation
 
-    def set_endpoint(self, endpoint_fn: Callable, *, operation_id: str | None = None) -> None:  # noqa: C901
+    def set_endpoint(self, endpoint_fn: Callable, *, operation_id: str | None = None) -> None:
         """
         Sets endpoint function for a given `operationId`.
 
@@ -113,55 +202,274 @@ class Application(Starlette):
             )
         else:
             operation_id_key = operation_id
-        try:
-            operation = self._operations[cast(str, operation_id_key)]
-        except KeyError as ex:
+        if operation_id_key not in self._operations:
             message = f"Unknown operationId: {operation_id}."
-            raise ValueError(message) from ex
+            raise ValueError(message)
+
+        operation_id_key = cast(str, operation_id_key)
+        self._endpoints[operation_id_key] = (operation_id, endpoint_fn)
+        self._swap_routes({operation_id_key: self._build_routes(operation_id_key)})
+
+    def _build_routes(self, operation_id_key: str) -> list[BaseRoute]:  # noqa: C901
+        """Builds the routes for an operation, based on the current spec."""
+        operation_id, endpoint_fn = self._endpoints[operation_id_key]
+        operation = self._operations[operation_id_key]
+        spec = self.spec
+        validators = self._validators
+
+        tracer = self.tracer
+        security = self.security_handlers
+        requirements = operation.spec.get("security", spec.get("security", []))
+        if security is not None and not security.applies_to(requirements):
+            security = None
+        locations = set(operation.parameters) | get_credential_locations(
+            _get_security_schemes(spec), requirements
+        )
+        has_body = "requestBody" in operation.spec
+        validate_security_first = has_body and bool(requirements)
+        # when the security is validated before reading the body, it isn't validated again
+        request_validator = (
+            validators.request_without_security
+            if validate_security_first
+            else validators.request
+        )
+
+        async def check_request(
+            request: Request, openapi_request: OpenAPIRequest, trace: Trace | NullTrace
+        ) -> Response | None:
+            """Checks the security and validity of the request, returning the rejection if any."""
+            if security is not None:
+                with trace.span("check_security"):
+                    authorized = await security.check(request, requirements)
+                if not authorized:
+                    return self._reject(operation_id_key, HTTPStatus.FORBIDDEN)
+            if validate_security_first:
+                # reject unauthorized requests before reading the body
+                with trace.span("validate_security"):
+                    rejection = self._validate_request(
+                        validators.security, openapi_request, operation_id_key
+                    )
+                if rejection is not None:
+                    return rejection
+            if has_body:
+                await openapi_request.load_body(self.spool_threshold)
+            with trace.span("validate_request"):
+                return self._validate_request(
+                    request_validator, openapi_request, operation_id_key
+                )
 
         @wraps(endpoint_fn)
         async def wrapper(request: Request, **kwargs) -> Response:
-            openapi_request = OpenAPIRequest(request)
-            try:
-                validate_request(
-                    request=openapi_request,
-                    spec=self.spec,
-                    extra_format_validators=self.custom_format_validators,
+            trace: Trace | NullTrace = NULL_TRACE
+            if tracer is not None:
+                trace = tracer.start_trace(request, operation_id_key)
+            with trace:
+                openapi_request = OpenAPIRequest(
+                    request, trace, locations=locations, has_body=has_body
                 )
+                rejection = await check_request(request, openapi_request, trace)
+                if rejection is not None:
+                    trace.attach(rejection)
+                    return rejection
+
+                with trace.span("handler"):
+                    response = endpoint_fn(request, **kwargs)
+                    if iscoroutine(response):
+                        response = await response
+                with trace.span("serialize"):
+                    response = _to_response(response, endpoint_fn)
+
+                if self._to_validate_response_for(operation_id):
+                    with trace.span("validate_response"):
+                        validators.response.validate(openapi_request, OpenAPIResponse(response))
+                trace.attach(response)
+                return response
+
+        endpoint: Callable = wrapper
+        if self.profiler is not None:
+            endpoint = self.profiler.wrap(wrapper, operation_id_key)
+
+        return [
+            Route(
+                server_path + operation.path,
+                endpoint,
+                methods=[operation.method],
+                name=operation_id,
+            )
+            for server_path in self._server_paths
+        ]
+
+    def _validate_request(
+        self, validator: RequestValidator, request: OpenAPIRequest, operation_id: str
+    ) -> Response | None:
+        """
+        Validates the request, returning the response rejecting it if it is invalid.
+
+        The errors reported by `openapi-core` are turned directly into the response,
+        without being wrapped in an `HTTPException` or logged. In debug mode, the errors
+        are logged and raised as HTTP errors instead.
+        """
+        if self.debug:
+            try:
+                validator.validate(request)
             except SecurityProviderError as ex:
-                if self.debug:
-                    log.exception("Invalid security")
-                raise HTTPException(HTTPStatus.FORBIDDEN, "Invalid security.") from ex
+                log.exception("Invalid security")
+                self._reject(operation_id, HTTPStatus.FORBIDDEN, ex)
             except OpenAPIError as ex:
-                if self.debug:
-                    log.exception("Bad request")
-                raise HTTPException(HTTPStatus.BAD_REQUEST, "Bad request") from ex
-
-            response = endpoint_fn(request, **kwargs)
-            if iscoroutine(response):
-                response = await response
-            if isinstance(response, dict):
-                response = JSONResponse(response)
-            elif not isinstance(response, Response):
-                message = (
-                    f"The endpoint function `{endpoint_fn.__name__}` must return"
-                    " either a dict or a Response instance."
-                )
-                raise TypeError(message)
-
-            if self._to_validate_response_for(operation_id):
-                validate_response(
-                    request=openapi_request,
-                    response=OpenAPIResponse(response),
-                    spec=self.spec,
-                    extra_format_validators=self.custom_format_validators,
-                )
-            return response
+                log.exception("Bad request")
+                self._reject(operation_id, HTTPStatus.BAD_REQUEST, ex)
+            return None
+
+        errors = list(validator.iter_errors(request))
+        if not errors:
+            return None
+        if isinstance(errors[0], SecurityProviderError):
+            return self.rejections.reject(operation_id, HTTPStatus.FORBIDDEN, errors)
+        return self.rejections.reject(operation_id, HTTPStatus.BAD_REQUEST, errors)
+
+    def _reject(
+        self, operation_id: str, status: HTTPStatus, cause: Exception | None = None
+    ) -> Response:
+        """Returns the response rejecting a request; in debug mode, raises an HTTP error."""
+        if self.debug:
+            self.rejections.count(operation_id, status)
+            raise HTTPException(status, REJECTION_DETAILS[status]) from cause
+        return self.rejections.reject(operation_id, status)
+
+    def _swap_routes(self, changes: Mapping[str, list[BaseRoute]]) -> None:
+        """
+        Replaces the routes of the given operations in a single step.
 
-        for server_path in self._server_paths:
-            self.add_route(
-                server_path + operation.path, wrapper, [operation.method], name=operation_id
-            )
+        The new routes take the place of the old ones in the routing table, while the
+        routes of new operations are appended; an empty list removes the operation.
+        """
+        stale = {
+            id(route): operation_id
+            for operation_id in changes
+            for route in self._operation_routes.get(operation_id, [])
+        }
+        routes: list[BaseRoute] = []
+        placed = set()
+        for route in self.router.routes:
+            operation_id = stale.get(id(route))
+            if operation_id is None:
+                routes.append(route)
+            elif operation_id not in placed:
+                routes.extend(changes[operation_id])
+                placed.add(operation_id)
+        for operation_id, new_routes in changes.items():
+            if operation_id not in placed:
+                routes.extend(new_routes)
+            if new_routes:
+                self._operation_routes[operation_id] = new_routes
+            else:
+                self._operation_routes.pop(operation_id, None)
+        self.router.routes = routes
+
+    def reload(self, spec: SchemaPath | dict, *, spec_url: str = "") -> set[str]:
+        """
+        Replaces the OpenAPI specification without restarting the application.
+
+        Only the operations that have been added or changed are recompiled, and their
+        routes are swapped in a single step; requests already in progress are finished
+        using the previous version. If the servers, components or global security of the
+        spec have changed, all operations are recompiled.
+
+        Args:
+            spec: The new OpenAPI specification.
+            spec_url: The URL of the OpenAPI specification, if needed.
+
+        Returns:
+            IDs of the operations that have been added, changed or removed.
+        """
+        if isinstance(spec, dict):
+            spec = SchemaPath.from_dict(spec, base_uri=spec_url)
+        return self._reload(self._compile_spec(spec))
+
+    def _reload(self, compiled: _CompiledSpec) -> set[str]:
+        """Swaps in a compiled spec, recompiling the routes of the changed operations."""
+        operations = compiled.operations
+        recompile_all = get_spec_fingerprint(compiled.spec) != get_spec_fingerprint(self.spec)
+        changed = {
+            operation_id
+            for operation_id, operation in operations.items()
+            if recompile_all
+            or operation_id not in self._operations
+            or operation.fingerprint != self._operations[operation_id].fingerprint
+        }
+        removed = set(self._operations) - set(operations)
+
+        # resolve all endpoints before changing anything, so failures leave the app intact
+        endpoints = {
+            operation_id: self._endpoints.get(operation_id)
+            or (operation_id, self._find_endpoint(operation_id))
+            for operation_id in changed
+            if operation_id in self._endpoints or self._module is not None
+        }
+
+        self._set_spec(compiled)
+        for operation_id in removed:
+            self._endpoints.pop(operation_id, None)
+        self._endpoints.update(endpoints)
+        changes: dict[str, list[BaseRoute]] = {operation_id: [] for operation_id in removed}
+        for operation_id in endpoints:
+            changes[operation_id] = self._build_routes(operation_id)
+        self._swap_routes(changes)
+        return changed | removed
+
+    def reload_from_file(self, path: Path | str) -> set[str]:
+        """
+        Reloads the OpenAPI specification from a local file.
+
+        Args:
+            path: Path of the OpenAPI spec file.
+
+        Returns:
+            IDs of the operations that have been added, changed or removed.
+        """
+        path = Path(path)
+        return self.reload(get_spec_from_file(path), spec_url=path.as_uri())
+
+    async def watch(self, path: Path | str, *, interval: float = 1.0) -> None:
+        """
+        Watches a local spec file and reloads the spec whenever the file changes.
+
+        Runs until cancelled, so it is usually started as a background task in the
+        application lifespan. The new spec is parsed and validated in a separate thread,
+        so only swapping the routes runs on the event loop. Errors while reloading are
+        logged, and the application keeps serving the previous version of the spec.
+
+        Args:
+            path: Path of the OpenAPI spec file.
+            interval: Number of seconds between checks for changes.
+        """
+        path = Path(path)
+
+        def compile_spec() -> _CompiledSpec:
+            spec = SchemaPath.from_dict(get_spec_from_file(path), base_uri=path.as_uri())
+            return self._compile_spec(spec)
+
+        modified = path.stat().st_mtime_ns
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if (current := path.stat().st_mtime_ns) == modified:
+                    continue
+                modified = current
+                # parsing and validating the spec is slow, so only the swap runs on the loop
+                compiled = await asyncio.to_thread(compile_spec)
+                changed = self._reload(compiled)
+            except Exception:
+                log.exception("Failed to reload the spec from %s", path)
+            else:
+                log.info("Reloaded the spec from %s; changed operations: %s", path, changed)
+
+    async def _execute_batch(self, request: Request) -> Response:
+        """Endpoint executing a batch of operation requests."""
+        routes = [route for routes in self._operation_routes.values() for route in routes]
+        return await execute_batch(
+            request, routes, self.batch_concurrency, self.batch_max_items
+        )
 
     def endpoint(self, operation_id: Callable | str):
         """
@@ -207,6 +515,36 @@ class Application(Starlette):
         return cls(get_spec_from_file(path), *args, spec_url=path.as_uri(), **kwargs)
 
 
+@dataclass(frozen=True)
+class _CompiledSpec:
+    """The spec and the state derived from it."""
+
+    spec: SchemaPath
+    validators: SpecValidators
+    operations: dict[str, OperationSpec]
+    server_paths: set[str]
+    security_handlers: SecurityHandlers | None
+
+
+def _to_response(result: object, endpoint_fn: Callable) -> Response:
+    """Helper function to convert the result of an endpoint function to a response."""
+    if isinstance(result, dict):
+        return JSONResponse(result)
+    if not isinstance(result, Response):
+        message = (
+            f"The endpoint function `{endpoint_fn.__name__}` must return"
+            " either a dict or a Response instance."
+        )
+        raise TypeError(message)
+    return result
+
+
+def _get_security_schemes(spec: SchemaPath) -> Mapping[str, Mapping]:
+    """Helper function to get the security schemes defined in the spec."""
+    components = spec["components"] if "components" in spec else {}
+    return components.get("securitySchemes", {})
+
+
 def _load_module(name: str) -> ModuleType:
     """Helper function to load a module based on its dotted-string name."""
     try:
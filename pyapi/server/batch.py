@@ -0,0 +1,162 @@
+"""Execution of batched operation requests."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+from collections.abc import Mapping, Sequence
+from contextlib import suppress
+from http import HTTPStatus
+from logging import getLogger
+from typing import Any
+from urllib.parse import urlencode
+
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import BaseRoute, Match
+
+log = getLogger(__name__)
+
+_SKIPPED_HEADERS = {b"content-length", b"content-type", b"transfer-encoding"}
+
+
+async def execute_batch(
+    request: Request, routes: Sequence[BaseRoute], concurrency: int, max_items: int
+) -> Response:
+    """
+    Executes a list of sub-requests against the operation routes.
+
+    The request body is expected to be a JSON list of objects with the keys
+    `method`, `path` and optionally `query`, `headers` and `body`. Each sub-request
+    inherits the headers of the batch request and is executed concurrently with
+    the others, with at most `concurrency` of them running at the same time.
+
+    Sub-requests are passed directly to the operation endpoints, so they skip the
+    middleware and exception handlers of the application. Bodies of responses that
+    are not valid UTF-8 are returned base64-encoded, marked with `"encoding": "base64"`.
+
+    Args:
+        request: The incoming batch request.
+        routes: Routes of the operations that can be called.
+        concurrency: Maximum number of sub-requests executed at the same time.
+        max_items: Maximum number of sub-requests in a batch; larger batches are rejected.
+    """
+    try:
+        items = await request.json()
+    except ValueError:
+        items = None
+    if not isinstance(items, list):
+        raise HTTPException(HTTPStatus.BAD_REQUEST, "Batch must be a list of requests.")
+    if len(items) > max_items:
+        message = f"Batch must not contain more than {max_items} requests."
+        raise HTTPException(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, message)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item: Any) -> dict:
+        async with semaphore:
+            return await _execute_item(request, routes, item)
+
+    results = await asyncio.gather(*(run(item) for item in items))
+    return JSONResponse(results)
+
+
+async def _execute_item(request: Request, routes: Sequence[BaseRoute], item: Any) -> dict:
+    try:
+        scope, body = _build_scope(request, item)
+        route = _match_route(routes, scope)
+
+        async def receive() -> dict:
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        response = await route.endpoint(Request(scope, receive))  # type: ignore[attr-defined]
+        return _response_result(response)
+    except HTTPException as ex:
+        return _result(ex.status_code, ex.detail)
+    except Exception:
+        log.exception("Batch item failed")
+        return _result(HTTPStatus.INTERNAL_SERVER_ERROR, "Internal Server Error")
+
+
+def _response_result(response: Response) -> dict:
+    """Converts a response to a result, decoding its body as JSON or text if possible."""
+    content = bytes(getattr(response, "body", b""))
+    if not content:
+        return _result(response.status_code, None)
+    if (response.media_type or "").endswith("json"):
+        with suppress(ValueError):
+            return _result(response.status_code, json.loads(content))
+    try:
+        text = content.decode("utf-8")
+    except UnicodeDecodeError:
+        result = _result(response.status_code, base64.b64encode(content).decode("ascii"))
+        result["encoding"] = "base64"
+        return result
+    return _result(response.status_code, text)
+
+
+def _match_route(routes: Sequence[BaseRoute], scope: dict) -> BaseRoute:
+    """Finds the route matching the scope, updating the scope with the path parameters."""
+    partial = False
+    for route in routes:
+        match, child_scope = route.matches(scope)
+        if match is Match.FULL:
+            scope.update(child_scope)
+            return route
+        partial = partial or match is Match.PARTIAL
+    if partial:
+        raise HTTPException(HTTPStatus.METHOD_NOT_ALLOWED)
+    raise HTTPException(HTTPStatus.NOT_FOUND)
+
+
+def _build_scope(request: Request, item: Any) -> tuple[dict, bytes]:
+    """Builds the ASGI scope and body of a sub-request, based on the batch request."""
+    if not (
+        isinstance(item, Mapping)
+        and isinstance(item.get("method"), str)
+        and isinstance(item.get("path"), str)
+    ):
+        raise HTTPException(HTTPStatus.BAD_REQUEST, "Invalid batch item.")
+
+    query = item.get("query") or ""
+    if isinstance(query, Mapping):
+        query = urlencode(query, doseq=True)
+
+    headers = [
+        (name, value)
+        for name, value in request.scope["headers"]
+        if name not in _SKIPPED_HEADERS
+    ]
+    item_headers = {
+        name.lower().encode("latin-1"): str(value).encode("latin-1")
+        for name, value in (item.get("headers") or {}).items()
+    }
+    headers = [(name, value) for name, value in headers if name not in item_headers]
+    headers.extend(item_headers.items())
+
+    body = b""
+    if item.get("body") is not None:
+        body = json.dumps(item["body"]).encode("utf-8")
+        if b"content-type" not in item_headers:
+            headers.append((b"content-type", b"application/json"))
+    headers.append((b"content-length", str(len(body)).encode("latin-1")))
+
+    path = request.scope.get("root_path", "") + item["path"]
+    scope = {
+        **request.scope,
+        "method": item["method"].upper(),
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": str(query).encode("latin-1"),
+        "headers": headers,
+        "path_params": {},
+        # each sub-request gets its own state, so that concurrent items don't share it
+        "state": dict(request.scope.get("state", {})),
+    }
+    return scope, body
+
+
+def _result(status: int, body: Any) -> dict:
+    return {"status": int(status), "body": body}
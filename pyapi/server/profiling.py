@@ -0,0 +1,206 @@
+"""On-demand profiling of requests."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import hmac
+import pstats
+import random
+import tracemalloc
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator, Callable, Collection
+from contextlib import asynccontextmanager
+from functools import wraps
+from pathlib import Path
+from time import time_ns
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+_MAX_STACK_DEPTH = 64
+_MIN_STACK_TIME = 1e-6
+
+
+class RequestProfiler:
+    """
+    Profiles selected requests using `cProfile`.
+
+    A request is profiled if it carries the configured header with the secret value,
+    or if it is randomly sampled; sampling can be limited to specific operations.
+    The statistics of each profiled request are written to a `.prof` file in a
+    subdirectory of `directory` named after the operation, and are also aggregated
+    per operation in memory.
+
+    Only one request is profiled at a time; while it is running, other requests are
+    not profiled. Note that the profiler also records any other tasks that run on the
+    event loop while the profiled request is waiting.
+
+    Args:
+        directory: Directory where the results are written.
+        header: Name of the header that triggers profiling.
+        secret: The value the header needs to have; if omitted, the header is ignored.
+        sample_rate: Fraction of requests that are profiled, between 0 and 1.
+        operation_ids: Operations whose requests are sampled; if omitted, all are.
+        trace_memory: If `True`, a `tracemalloc` snapshot of the allocations made
+                      during the request is also written, to a `.tracemalloc` file.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        header: str = "X-Profile",
+        secret: str | None = None,
+        sample_rate: float = 0.0,
+        operation_ids: Collection[str] | None = None,
+        trace_memory: bool = False,
+    ):
+        self.directory = Path(directory)
+        self.header = header
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.operation_ids = operation_ids
+        self.trace_memory = trace_memory
+        self._stats: dict[str, pstats.Stats] = {}
+        self._active = False
+
+    def should_profile(self, request: Request, operation_id: str) -> bool:
+        """Checks whether the request to the operation should be profiled."""
+        if self._active:
+            return False
+        if self.secret is not None:
+            value = request.headers.get(self.header)
+            # compared as raw bytes, as `compare_digest` only accepts ASCII strings
+            if value is not None and hmac.compare_digest(
+                value.encode("latin-1"), self.secret.encode("utf-8")
+            ):
+                return True
+        if self.operation_ids is not None and operation_id not in self.operation_ids:
+            return False
+        return random.random() < self.sample_rate  # noqa: S311
+
+    def wrap(self, endpoint: Callable, operation_id: str) -> Callable:
+        """Wraps an endpoint so that its selected requests are profiled."""
+
+        @wraps(endpoint)
+        async def profiled_endpoint(request: Request, **kwargs) -> Response:
+            if not self.should_profile(request, operation_id):
+                return await endpoint(request, **kwargs)
+            async with self.profile(operation_id):
+                return await endpoint(request, **kwargs)
+
+        return profiled_endpoint
+
+    @asynccontextmanager
+    async def profile(self, operation_id: str) -> AsyncIterator[None]:
+        """
+        Async context manager profiling the code it contains.
+
+        Taking the memory snapshot and writing the results are done in a separate
+        thread, so that they don't block the event loop.
+        """
+        self._active = True
+        path = self.directory / operation_id / str(time_ns())
+
+        start_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            try:
+                snapshot = None
+                if self.trace_memory:
+                    snapshot = await asyncio.to_thread(tracemalloc.take_snapshot)
+                if start_tracing:
+                    tracemalloc.stop()
+                await asyncio.to_thread(_write_results, path, profile, snapshot)
+            finally:
+                self._active = False
+
+            if operation_id in self._stats:
+                self._stats[operation_id].add(profile)
+            else:
+                self._stats[operation_id] = pstats.Stats(profile)
+
+    def get_stats(self, operation_id: str) -> pstats.Stats | None:
+        """Returns the aggregated statistics of an operation, if it has been profiled."""
+        return self._stats.get(operation_id)
+
+    def dump_stats(self, operation_id: str, path: Path | str) -> None:
+        """Writes the aggregated statistics of an operation to a file in `pstats` format."""
+        self._get_stats(operation_id).dump_stats(path)
+
+    def dump_collapsed(self, operation_id: str, path: Path | str) -> None:
+        """
+        Writes the aggregated statistics of an operation in "collapsed stacks" format.
+
+        The output can be used for generating flame graphs, e.g. by `flamegraph.pl`
+        or `speedscope`. As `cProfile` only records direct callers of each function,
+        the time of functions called from multiple places is split between the
+        stacks in proportion to the time spent on each call.
+        """
+        lines = collapse_stacks(self._get_stats(operation_id))
+        with Path(path).open("w", encoding="utf-8") as output:
+            output.writelines(f"{stack} {value}\n" for stack, value in lines.items())
+
+    def _get_stats(self, operation_id: str) -> pstats.Stats:
+        stats = self.get_stats(operation_id)
+        if stats is None:
+            message = f"Operation {operation_id} has not been profiled."
+            raise ValueError(message)
+        return stats
+
+
+def _write_results(
+    path: Path, profile: cProfile.Profile, snapshot: tracemalloc.Snapshot | None
+) -> None:
+    """Writes the results of profiling a request to files with the given base path."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profile.dump_stats(path.with_suffix(".prof"))
+    if snapshot is not None:
+        snapshot.dump(str(path.with_suffix(".tracemalloc")))
+
+
+def collapse_stacks(stats: pstats.Stats) -> dict[str, int]:
+    """Converts profiling statistics to collapsed stacks, with times in microseconds."""
+    entries = stats.stats  # type: ignore[attr-defined]
+    callees: dict[tuple, dict[tuple, float]] = defaultdict(dict)
+    for function, (*_, callers) in entries.items():
+        for caller, caller_stats in callers.items():
+            callees[caller][function] = caller_stats[3]
+
+    stacks: Counter[str] = Counter()
+
+    def visit(function: tuple, stack: tuple[tuple, ...], share: float) -> None:
+        stack = (*stack, function)
+        own_time = entries[function][2] * share
+        if own_time:
+            stacks[";".join(_label(item) for item in stack)] += own_time
+        if len(stack) >= _MAX_STACK_DEPTH:
+            return
+        for callee, time_from_caller in callees[function].items():
+            total_time = entries[callee][3]
+            if callee not in stack and share * time_from_caller >= _MIN_STACK_TIME:
+                visit(callee, stack, share * time_from_caller / total_time)
+
+    for function, (*_, callers) in entries.items():
+        if not callers:
+            visit(function, (), 1.0)
+
+    return {
+        stack: round(seconds * 1_000_000)
+        for stack, seconds in stacks.items()
+        if round(seconds * 1_000_000)
+    }
+
+
+def _label(function: tuple) -> str:
+    filename, line, name = function
+    if filename == "~":
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
@@ -0,0 +1,105 @@
+"""Cheap rejection of invalid requests."""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from collections.abc import Sequence
+from http import HTTPStatus
+from time import monotonic
+from typing import Any
+
+from starlette.responses import Response
+
+PROBLEM_MEDIA_TYPE = "application/problem+json"
+
+REJECTION_DETAILS = {
+    HTTPStatus.BAD_REQUEST: "Bad request",
+    HTTPStatus.FORBIDDEN: "Invalid security.",
+}
+
+
+class Rejections:
+    """
+    Builds the responses to rejected requests and counts them per operation.
+
+    The responses are `application/problem+json` documents (RFC 9457) whose bodies are
+    prebuilt for each status. The validation errors are listed in the `errors` member
+    of the response only while the per-operation rate allows it; above that rate,
+    the prebuilt body is returned as is, so that floods of invalid requests stay cheap.
+
+    Args:
+        max_errors: Maximum number of validation errors listed in a response;
+                    if 0, the errors are never listed.
+        error_rate: Number of responses per second, per operation, that list the
+                    validation errors; bursts of up to this number are allowed.
+    """
+
+    def __init__(self, max_errors: int = 10, error_rate: float = 10.0):
+        self.max_errors = max_errors
+        self.error_rate = error_rate
+        self.counts: Counter[tuple[str, int]] = Counter()
+        self._budgets: dict[str, tuple[float, float]] = {}
+        self._bodies = {status: _encode(_problem(status)) for status in REJECTION_DETAILS}
+
+    def reject(
+        self, operation_id: str, status: HTTPStatus, errors: Sequence[Exception] = ()
+    ) -> Response:
+        """Counts a rejected request to the operation and returns the response to it."""
+        self.count(operation_id, status)
+        if errors and self.max_errors and self._take_budget(operation_id):
+            problem = _problem(status)
+            problem["errors"] = describe_errors(errors)[: self.max_errors]
+            body = _encode(problem)
+        else:
+            body = self._bodies[status]
+        return Response(body, status, media_type=PROBLEM_MEDIA_TYPE)
+
+    def count(self, operation_id: str, status: HTTPStatus) -> None:
+        """Counts a rejected request to the operation."""
+        self.counts[operation_id, int(status)] += 1
+
+    def _take_budget(self, operation_id: str) -> bool:
+        """Token bucket limiting the rate of the responses listing the errors."""
+        now = monotonic()
+        tokens, updated = self._budgets.get(operation_id, (self.error_rate, now))
+        tokens = min(self.error_rate, tokens + (now - updated) * self.error_rate)
+        allowed = tokens >= 1
+        self._budgets[operation_id] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+
+def describe_errors(errors: Sequence[Exception]) -> list[dict[str, str]]:
+    """
+    Converts validation errors to JSON-serializable dictionaries.
+
+    Errors caused by schema validation are split into one entry per schema error,
+    with the JSON pointer of the invalid value in the `pointer` member.
+    """
+    described = []
+    for error in errors:
+        cause = error.__cause__
+        schema_errors = getattr(cause, "schema_errors", None)
+        if not schema_errors:
+            entry = {"title": str(error)}
+            if cause is not None:
+                entry["detail"] = str(cause)
+            described.append(entry)
+            continue
+        described.extend(
+            {
+                "title": str(error),
+                "detail": schema_error.message,
+                "pointer": "".join(f"/{part}" for part in schema_error.absolute_path),
+            }
+            for schema_error in schema_errors
+        )
+    return described
+
+
+def _problem(status: HTTPStatus) -> dict[str, Any]:
+    return {"title": status.phrase, "status": int(status), "detail": REJECTION_DETAILS[status]}
+
+
+def _encode(problem: dict[str, Any]) -> bytes:
+    return json.dumps(problem, separators=(",", ":")).encode("utf-8")
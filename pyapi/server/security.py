@@ -0,0 +1,174 @@
+"""Pluggable asynchronous security handlers."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from inspect import isawaitable
+from logging import getLogger
+from time import monotonic
+
+from starlette.requests import Request
+
+from .validation import PARAMETER_SOURCES
+
+log = getLogger(__name__)
+
+SecurityHandler = Callable[[str, Sequence[str]], "bool | Awaitable[bool]"]
+
+
+class CredentialCache:
+    """
+    Caches the results of security handlers per scheme and credential.
+
+    Args:
+        ttl: Number of seconds a successful check is remembered.
+        negative_ttl: Number of seconds a failed check is remembered.
+        maxsize: Maximum number of cached results; the oldest are evicted first.
+    """
+
+    def __init__(self, ttl: float = 60.0, negative_ttl: float = 5.0, maxsize: int = 10_000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self._results: dict[tuple, tuple[float, bool]] = {}
+
+    def get(self, key: tuple) -> bool | None:
+        """Returns the cached result for the key, or `None` if missing or expired."""
+        try:
+            expires_at, result = self._results[key]
+        except KeyError:
+            return None
+        if expires_at < monotonic():
+            del self._results[key]
+            return None
+        return result
+
+    def set(self, key: tuple, result: bool) -> None:
+        """Stores the result for the key, evicting the oldest entry if full."""
+        ttl = self.ttl if result else self.negative_ttl
+        if ttl <= 0:
+            return
+        if key not in self._results and len(self._results) >= self.maxsize:
+            del self._results[next(iter(self._results))]
+        self._results[key] = (monotonic() + ttl, result)
+
+    def clear(self) -> None:
+        """Removes all cached results."""
+        self._results.clear()
+
+
+class SecurityHandlers:
+    """
+    Evaluates security requirements using asynchronous handlers.
+
+    Each handler is keyed by a name from `components.securitySchemes` and is called
+    with the credential extracted from the request and the scopes listed in the
+    requirement; it returns (or resolves to) `True` if the credential is valid.
+    Schemes without a handler are only checked for the presence of the credential,
+    the same as `openapi-core` does.
+
+    Args:
+        schemes: The `securitySchemes` section of the spec.
+        handlers: A mapping of scheme names to handler callables.
+        cache: Cache for handler results; if omitted, a default one is created.
+    """
+
+    def __init__(
+        self,
+        schemes: Mapping[str, Mapping],
+        handlers: Mapping[str, SecurityHandler],
+        cache: CredentialCache | None = None,
+    ):
+        unknown = set(handlers) - set(schemes)
+        if unknown:
+            message = f"Unknown security schemes: {', '.join(sorted(unknown))}."
+            raise ValueError(message)
+        self.schemes = schemes
+        self.handlers = handlers
+        self.cache = cache if cache is not None else CredentialCache()
+
+    def applies_to(self, requirements: Sequence[Mapping[str, Sequence[str]]]) -> bool:
+        """Checks whether any of the requirements refers to a scheme with a handler."""
+        return any(name in self.handlers for req in requirements for name in req)
+
+    async def check(
+        self, request: Request, requirements: Sequence[Mapping[str, Sequence[str]]]
+    ) -> bool:
+        """
+        Checks whether the request satisfies at least one of the requirements.
+
+        Alternative requirements are evaluated concurrently, and the remaining
+        checks are cancelled as soon as one of them succeeds. A handler raising an
+        exception is logged, and treated as rejecting the credential.
+        """
+        if not requirements or any(not req for req in requirements):
+            return True
+        if len(requirements) == 1:
+            return await self._check_requirement(request, requirements[0])
+
+        tasks = [
+            asyncio.ensure_future(self._check_requirement(request, req)) for req in requirements
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                if await next_done:
+                    return True
+            return False
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _check_requirement(
+        self, request: Request, requirement: Mapping[str, Sequence[str]]
+    ) -> bool:
+        checks = [
+            self._check_scheme(request, name, scopes) for name, scopes in requirement.items()
+        ]
+        results = await asyncio.gather(*checks)
+        return all(results)
+
+    async def _check_scheme(self, request: Request, name: str, scopes: Sequence[str]) -> bool:
+        credential = get_credential(request, self.schemes[name])
+        if credential is None or name not in self.handlers:
+            return credential is not None
+
+        key = (name, credential, tuple(scopes))
+        result = self.cache.get(key)
+        if result is None:
+            try:
+                outcome = self.handlers[name](credential, scopes)
+                if isawaitable(outcome):
+                    outcome = await outcome
+            except Exception:
+                # not cached, as the failure may be temporary
+                log.exception("Security handler for %s failed", name)
+                return False
+            result = bool(outcome)
+            self.cache.set(key, result)
+        return result
+
+
+def get_credential(request: Request, scheme: Mapping) -> str | None:
+    """Extracts the credential defined by a security scheme from the request."""
+    if scheme.get("type") == "apiKey":
+        source = getattr(request, PARAMETER_SOURCES.get(scheme.get("in", ""), "headers"))
+        return source.get(scheme.get("name", ""))
+
+    auth_type, _, credential = request.headers.get("Authorization", "").partition(" ")
+    expected_type = scheme.get("scheme", "") if scheme.get("type") == "http" else "bearer"
+    if not credential or auth_type.lower() != expected_type.lower():
+        return None
+    return credential
+
+
+def get_credential_locations(
+    schemes: Mapping[str, Mapping], requirements: Sequence[Mapping[str, Sequence[str]]]
+) -> set[str]:
+    """Returns the parameter locations of the credentials used by the requirements."""
+    return {
+        schemes[name].get("in", "header") if schemes[name].get("type") == "apiKey" else "header"
+        for requirement in requirements
+        for name in requirement
+        if name in schemes
+    }
@@ -42,6 +42,13 @@ class OperationSpec:
             return self.spec[camelcase_name]
         return super().__getattribute__(name)
 
+    @property
+    def fingerprint(self) -> str:
+        """A string representation of the operation, used for detecting changes."""
+        return json.dumps(
+            [self.path, self.method, self.spec, self.parameters], sort_keys=True, default=str
+        )
+
     @classmethod
     def get_all(cls, spec: SchemaPath) -> dict[str, OperationSpec]:
         """Builds a dict of all operations in the spec."""
@@ -65,6 +72,12 @@ class SpecFileTypes(tuple, Enum):
     YAML = ("yaml", "yml")
 
 
+def get_spec_fingerprint(spec: SchemaPath) -> str:
+    """Creates a string representation of the spec parts shared by all operations."""
+    shared = {key: spec[key] for key in ("servers", "components", "security") if key in spec}
+    return json.dumps(shared, sort_keys=True, default=str)
+
+
 def get_spec_from_file(path: Path) -> dict:
     """Loads a local file and creates an OpenAPI `Spec` object."""
     suffix = path.suffix[1:].lower()
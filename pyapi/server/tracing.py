@@ -0,0 +1,240 @@
+"""Lightweight tracing of the request lifecycle."""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import re
+import threading
+from collections import deque
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from http import HTTPStatus
+from logging import getLogger
+from pathlib import Path
+from time import time_ns
+from typing import Any, Protocol, TextIO
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+log = getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    """A timed step of handling a request; timestamps are in nanoseconds since epoch."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start: int
+    end: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> int | None:
+        """Duration of the span in nanoseconds, if it has ended."""
+        return None if self.end is None else self.end - self.start
+
+    def to_dict(self) -> dict[str, Any]:
+        """Converts the span to a JSON-serializable dictionary."""
+        return {**asdict(self), "duration": self.duration}
+
+
+class SpanExporter(Protocol):
+    """Interface of the classes receiving finished spans."""
+
+    def export(self, spans: Sequence[Span]) -> None:
+        """Receives all spans of a finished request."""
+
+
+class InMemoryExporter:
+    """
+    Keeps the most recent spans in a ring buffer.
+
+    Args:
+        maxlen: Maximum number of spans kept.
+    """
+
+    def __init__(self, maxlen: int = 10_000):
+        self.spans: deque[Span] = deque(maxlen=maxlen)
+
+    def export(self, spans: Sequence[Span]) -> None:
+        """Adds the spans to the buffer, discarding the oldest ones if full."""
+        self.spans.extend(spans)
+
+
+class JSONLinesExporter:
+    """
+    Appends spans to a file, one JSON object per line.
+
+    The file is kept open, and the spans are serialized and written by a background
+    thread, so exporting them doesn't block the event loop. `flush` waits until all
+    exported spans have been written, and `close` also stops the thread and closes
+    the file.
+
+    Args:
+        path: Path of the file.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._queue: queue.Queue[Sequence[Span] | None] = queue.Queue()
+        output = self.path.open("a", encoding="utf-8")
+        self._thread = threading.Thread(
+            target=self._write, args=(output,), name="JSONLinesExporter", daemon=True
+        )
+        self._thread.start()
+
+    def export(self, spans: Sequence[Span]) -> None:
+        """Queues the spans to be written to the end of the file."""
+        self._queue.put(spans)
+
+    def flush(self) -> None:
+        """Waits until all exported spans have been written to the file."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Writes the remaining spans, then stops the background thread and closes the file."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _write(self, output: TextIO) -> None:
+        """Writes the queued spans until the exporter is closed."""
+        with output:
+            while (spans := self._queue.get()) is not None:
+                self._write_spans(output, spans)
+            self._queue.task_done()
+
+    def _write_spans(self, output: TextIO, spans: Sequence[Span]) -> None:
+        """Writes the spans of a request; errors are logged and ignored."""
+        try:
+            output.writelines(json.dumps(span.to_dict()) + "\n" for span in spans)
+            if self._queue.empty():
+                output.flush()
+        except Exception:
+            log.exception("Failed to write spans to %s", self.path)
+        finally:
+            self._queue.task_done()
+
+
+class Tracer:
+    """
+    Creates request traces and passes their spans to the exporters.
+
+    Args:
+        exporters: Exporters receiving the spans of finished requests;
+                   if omitted, an `InMemoryExporter` is used.
+    """
+
+    def __init__(self, exporters: Sequence[SpanExporter] | None = None):
+        self.exporters = list(exporters) if exporters is not None else [InMemoryExporter()]
+
+    def start_trace(self, request: Request, operation_id: str) -> Trace:
+        """
+        Starts a trace of handling a request.
+
+        If the request carries a valid W3C `traceparent` header, the trace continues
+        the one it identifies; otherwise a new trace is started.
+        """
+        trace_id, parent_id = None, None
+        if match := _TRACEPARENT.match(request.headers.get(TRACEPARENT_HEADER, "")):
+            trace_id, parent_id = match.groups()
+        return Trace(
+            self,
+            trace_id or os.urandom(16).hex(),
+            parent_id,
+            operation_id=operation_id,
+            method=request.method,
+            path=request.url.path,
+        )
+
+    def export(self, spans: Sequence[Span]) -> None:
+        """Passes the spans to all exporters."""
+        for exporter in self.exporters:
+            _export(exporter, spans)
+
+
+def _export(exporter: SpanExporter, spans: Sequence[Span]) -> None:
+    """Helper function exporting spans; errors are logged and ignored."""
+    try:
+        exporter.export(spans)
+    except Exception:
+        log.exception("Failed to export spans with %r", exporter)
+
+
+class Trace:
+    """
+    Spans recorded while handling a single request.
+
+    The trace is used as a context manager around handling the request: on exit,
+    the root span is ended, tagged with the outcome, and all spans are exported.
+    """
+
+    def __init__(self, tracer: Tracer, trace_id: str, parent_id: str | None, **attributes):
+        self.tracer = tracer
+        self.root = Span("request", trace_id, os.urandom(8).hex(), parent_id, time_ns())
+        self.root.attributes.update(attributes)
+        self.spans = [self.root]
+
+    def __enter__(self) -> Trace:
+        """Returns the trace itself."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Ends the trace and exports its spans."""
+        if exc_type is not None:
+            self.root.attributes["outcome"] = "error"
+            self.root.attributes["error"] = exc_type.__name__
+            status_code = getattr(exc_value, "status_code", None)
+            if status_code is not None:
+                self.root.attributes["status_code"] = int(status_code)
+        self.root.end = time_ns()
+        self.tracer.export(self.spans)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        """Context manager recording a child span of the request."""
+        span = Span(name, self.root.trace_id, os.urandom(8).hex(), self.root.span_id, time_ns())
+        self.spans.append(span)
+        try:
+            yield span
+        finally:
+            span.end = time_ns()
+
+    def attach(self, response: Response) -> None:
+        """Tags the trace with the response status and adds the trace context to it."""
+        success = response.status_code < HTTPStatus.BAD_REQUEST
+        self.root.attributes["outcome"] = "success" if success else "error"
+        self.root.attributes["status_code"] = response.status_code
+        response.headers[TRACEPARENT_HEADER] = f"00-{self.root.trace_id}-{self.root.span_id}-01"
+
+
+class NullTrace:
+    """A trace that records nothing, used when tracing is disabled."""
+
+    _span = nullcontext()
+
+    def __enter__(self) -> NullTrace:
+        """Returns the trace itself."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Does nothing."""
+
+    def span(self, name: str) -> nullcontext:
+        """Returns a context manager that does nothing."""
+        return self._span
+
+    def attach(self, response: Response) -> None:
+        """Does nothing."""
+
+
+NULL_TRACE = NullTrace()
@@ -3,37 +3,218 @@
 from __future__ import annotations
 
 import asyncio
+import warnings
+from collections.abc import Callable, Collection, Mapping
 from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, cast
 
-from openapi_core import protocols
+from jsonschema_path import SchemaPath
+from openapi_core import Config, OpenAPI, protocols
 from openapi_core.validation.request.datatypes import RequestParameters
-from starlette.datastructures import Headers
+from openapi_core.validation.request.validators import (
+    V30RequestSecurityValidator,
+    V30RequestValidator,
+    V31RequestSecurityValidator,
+    V31RequestValidator,
+)
+from openapi_spec_validator.versions import consts as versions
+from starlette.datastructures import FormData, Headers, UploadFile
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response  # noqa: F401
 
+from .tracing import NULL_TRACE, NullTrace, Trace
+
+try:
+    try:
+        from python_multipart.multipart import parse_options_header
+    except ModuleNotFoundError:  # pragma: no cover
+        # versions of python-multipart before 0.0.13 only provide the `multipart` package
+        from multipart.multipart import parse_options_header  # type: ignore[no-redef]
+except ModuleNotFoundError:  # pragma: no cover
+    parse_options_header = None  # type: ignore[assignment]
+
+MULTIPART_FORM = "multipart/form-data"
+OCTET_STREAM = "application/octet-stream"
+
+# stands in for spooled binary content, which is not validated beyond its presence
+_SPOOLED_CONTENT = b"\x00"
+
+# request attributes containing the parameters in each location
+PARAMETER_SOURCES = {
+    "query": "query_params",
+    "header": "headers",
+    "cookie": "cookies",
+    "path": "path_params",
+}
+
+
+class _SkipSecurityMixin:
+    """Skips the security requirements, for requests whose security is validated separately."""
+
+    def _get_security(
+        self, parameters: RequestParameters, operation: SchemaPath
+    ) -> dict[str, str] | None:
+        return {}
+
+
+class _V30RequestValidatorWithoutSecurity(_SkipSecurityMixin, V30RequestValidator):
+    pass
+
+
+class _V31RequestValidatorWithoutSecurity(_SkipSecurityMixin, V31RequestValidator):
+    pass
+
+
+_SECURITY_VALIDATORS = {
+    versions.OPENAPIV30: V30RequestSecurityValidator,
+    versions.OPENAPIV31: V31RequestSecurityValidator,
+}
+
+_REQUEST_VALIDATORS_WITHOUT_SECURITY = {
+    versions.OPENAPIV30: _V30RequestValidatorWithoutSecurity,
+    versions.OPENAPIV31: _V31RequestValidatorWithoutSecurity,
+}
+
+
+class SpecValidators:
+    """
+    Request and response validators, created once for a spec.
+
+    Besides the full request validator, the security requirements can be validated
+    separately by `security`, and everything else by `request_without_security`.
+
+    Args:
+        spec: OpenAPI specification.
+        extra_format_validators: A mapping of functions validating custom formats.
+    """
+
+    def __init__(
+        self, spec: SchemaPath, extra_format_validators: Mapping[str, Callable] | None = None
+    ):
+        formats = dict(extra_format_validators) if extra_format_validators else None
+        openapi = OpenAPI(spec, config=Config(extra_format_validators=formats))
+        self.request = openapi.request_validator
+        self.response = openapi.response_validator
+        self.security = _SECURITY_VALIDATORS[openapi.version](
+            spec, extra_format_validators=formats
+        )
+        self.request_without_security = _REQUEST_VALIDATORS_WITHOUT_SECURITY[openapi.version](
+            spec, extra_format_validators=formats
+        )
+
 
 class OpenAPIRequest(protocols.Request):
-    """Wrapper for PyAPI Server requests."""
+    """
+    Wrapper for PyAPI Server requests.
+
+    The parameters are only taken from the given `locations` (by default, all of them),
+    when first accessed. The body is read by awaiting `load_body`; if it has not been
+    loaded when first accessed, it is read synchronously. If `has_body` is `False`,
+    the body is not read at all.
+    """
 
-    def __init__(self, request: Request):
+    def __init__(
+        self,
+        request: Request,
+        trace: Trace | NullTrace = NULL_TRACE,
+        *,
+        locations: Collection[str] | None = None,
+        has_body: bool = True,
+    ):
         self.request = request
+        self.trace = trace
+        self.locations = PARAMETER_SOURCES.keys() if locations is None else locations
         self._body: str | bytes | None = None
-        self.parameters = RequestParameters(
-            query=self.request.query_params,
-            header=self.request.headers,
-            cookie=self.request.cookies,
-            path=self.request.path_params,
+        self._body_loaded = not has_body
+
+    @cached_property
+    def parameters(self) -> RequestParameters:  # type: ignore[override]
+        """Return the request parameters from the locations used by the operation."""
+        return RequestParameters(
+            **{
+                location: getattr(self.request, PARAMETER_SOURCES[location])
+                for location in self.locations
+            }
         )
-        self._body_task = None
 
-        body_coroutine = self.request.body()
-        if asyncio.get_event_loop().is_running():
-            # if there is an active event loop, run in separate thread
-            pool = ThreadPoolExecutor()
-            self._body = pool.submit(asyncio.run, body_coroutine).result()  # type: ignore
-        else:
-            # in a fully sync environment, run in a new loop
-            self._body = asyncio.run(body_coroutine)
+    async def load_body(self, spool_threshold: int | None = None) -> None:
+        """
+        Reads the request body.
+
+        If `spool_threshold` is set, `multipart/form-data` and `application/octet-stream`
+        bodies that are larger, or whose length is not known in advance, are streamed
+        instead of being read into memory:
+
+        - multipart bodies are parsed by Starlette's form parser, which spools each file
+          to disk above its own limit of 1 MB; files larger than `spool_threshold` are
+          left empty in the validated body, and all files are available from
+          `await request.form()` as usual;
+        - binary bodies are written to a temporary file, which is kept in memory up to
+          `spool_threshold` and written to disk above it; if the body turns out to be
+          larger than the threshold, it is only checked for presence, and is available
+          as the `UploadFile` `request.state.upload`.
+
+        Binary bodies that turn out to fit under the threshold are kept in memory, so
+        `await request.body()` is only unavailable for streamed multipart bodies and
+        binary bodies larger than the threshold.
+
+        Args:
+            spool_threshold: Size in bytes above which the bodies are streamed.
+        """
+        with self.trace.span("read_body"):
+            if spool_threshold is not None and self.mimetype == MULTIPART_FORM:
+                self._body = await self._read_form(spool_threshold)
+            elif spool_threshold is not None and self.mimetype == OCTET_STREAM:
+                self._body = await self._read_binary(spool_threshold)
+            else:
+                self._body = await self.request.body()
+            self._body_loaded = True
+
+    async def _read_form(self, spool_threshold: int) -> bytes:
+        """Parses a multipart body and rebuilds it with the large files left out."""
+        if parse_options_header is None:
+            warnings.warn(
+                "python-multipart is not installed, so multipart bodies are read into memory.",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+            return await self.request.body()
+        if self._fits(spool_threshold):
+            return await self.request.body()
+        _, options = parse_options_header(self.request.headers["Content-Type"])
+        boundary = options.get(b"boundary", b"")
+        form = await self.request.form()
+        return await _encode_form(form, boundary, spool_threshold)
+
+    async def _read_binary(self, spool_threshold: int) -> bytes:
+        """Streams a binary body into a temporary file if it is larger than the threshold."""
+        if self._fits(spool_threshold):
+            return await self.request.body()
+
+        upload = UploadFile(
+            cast(BinaryIO, SpooledTemporaryFile(max_size=spool_threshold)),
+            size=0,
+            headers=self.request.headers,
+        )
+        async for chunk in self.request.stream():
+            await upload.write(chunk)
+        await upload.seek(0)
+
+        if cast(int, upload.size) > spool_threshold:
+            self.request.state.upload = upload
+            return _SPOOLED_CONTENT
+        content = await upload.read()
+        await upload.close()
+        # the stream has been consumed, so keep the content for `await request.body()`
+        self.request._body = content
+        return content
+
+    def _fits(self, spool_threshold: int) -> bool:
+        """Checks whether the body has a known length not larger than the threshold."""
+        content_length = self.request.headers.get("Content-Length", "")
+        return content_length.isdigit() and int(content_length) <= spool_threshold
 
     @property
     def host_url(self) -> str:
@@ -53,6 +234,16 @@ class OpenAPIRequest(protocols.Request):
     @property
     def body(self) -> bytes | None:
         """Return the request body as string, if present."""
+        if not self._body_loaded:
+            body_coroutine = self.request.body()
+            if asyncio.get_event_loop().is_running():
+                # if there is an active event loop, run in separate thread
+                pool = ThreadPoolExecutor()
+                self._body = pool.submit(asyncio.run, body_coroutine).result()  # type: ignore
+            else:
+                # in a fully sync environment, run in a new loop
+                self._body = asyncio.run(body_coroutine)
+            self._body_loaded = True
         if isinstance(self._body, str):
             return self._body.encode("utf-8")
         return self._body
@@ -68,8 +259,8 @@ class OpenAPIRequest(protocols.Request):
 
     @property
     def content_type(self) -> str:
-        """Return the request content type."""
-        return self.mimetype
+        """Return the request content type, including any parameters."""
+        return self.request.headers.get("Content-Type", "")
 
 
 class OpenAPIResponse(protocols.Response):
@@ -104,3 +295,25 @@ class OpenAPIResponse(protocols.Response):
     def content_type(self) -> str:
         """Return the response content type."""
         return self.mimetype
+
+
+async def _encode_form(form: FormData, boundary: bytes, spool_threshold: int) -> bytes:
+    """Encodes the form as a multipart body, replacing large files with empty content."""
+    parts = []
+    for name, value in form.multi_items():
+        disposition = f'form-data; name="{name}"'
+        if isinstance(value, UploadFile):
+            disposition += f'; filename="{value.filename or name}"'
+            headers = f"Content-Disposition: {disposition}\r\n"
+            if value.content_type:
+                headers += f"Content-Type: {value.content_type}\r\n"
+            content = b""
+            if value.size is not None and value.size <= spool_threshold:
+                content = await value.read()
+                await value.seek(0)
+        else:
+            headers = f"Content-Disposition: {disposition}\r\n"
+            content = value.encode("utf-8")
+        parts.append(b"--%s\r\n%s\r\n%s\r\n" % (boundary, headers.encode("utf-8"), content))
+    parts.append(b"--%s--\r\n" % boundary)
+    return b"".join(parts)
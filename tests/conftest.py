@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 
 import pytest
+from starlette.requests import Request
 
 
 @pytest.fixture
@@ -20,3 +21,43 @@ class Config:
 @pytest.fixture
 def config():
     return Config()
+
+
+def _make_request(method="GET", path="/test", *, query_string=b"", headers=None, body=None):
+    """
+    Creates a Starlette request, as received by an endpoint.
+
+    The body is given as a list of chunks, received one by one; if it is omitted,
+    reading the body fails the test.
+    """
+    if body is None:
+
+        async def receive():
+            pytest.fail("The body should not be read.")
+
+    else:
+        messages = [
+            {"type": "http.request", "body": chunk, "more_body": index < len(body) - 1}
+            for index, chunk in enumerate(body)
+        ]
+
+        async def receive():
+            return messages.pop(0)
+
+    scope = {
+        "type": "http",
+        "root_path": "http://localhost:8000",
+        "path": path,
+        "query_string": query_string,
+        "headers": [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in (headers or {}).items()
+        ],
+        "method": method,
+    }
+    return Request(scope, receive)
+
+
+@pytest.fixture
+def make_request():
+    return _make_request
@@ -0,0 +1,140 @@
+import asyncio
+import json
+
+import pytest
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import Response
+
+from pyapi.server import Application
+
+
+def _batch_request(app, items):
+    body = json.dumps(items).encode()
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {
+        "type": "http",
+        "path": "/batch",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "app": app,
+        "method": "POST",
+        "server": ("localhost", 8000),
+        "scheme": "http",
+        "state": {},
+    }
+    return Request(scope, receive)
+
+
+def _batch_endpoint(app):
+    return next(route for route in app.routes if route.name == "batch").endpoint
+
+
+def test_batch_route_is_added_only_when_path_is_given(spec_dict, config):
+    app = Application(spec_dict, module=config.endpoint_base)
+    assert all(route.name != "batch" for route in app.routes)
+
+    app = Application(spec_dict, module=config.endpoint_base, batch_path="/batch")
+    route = next(route for route in app.routes if route.name == "batch")
+    assert route.path == "/batch"
+    assert route.methods == {"POST"}
+
+
+@pytest.mark.asyncio
+async def test_batch_executes_operations_and_returns_results_in_order(spec_dict, config):
+    app = Application(spec_dict, module=config.endpoint_base, batch_path="/batch")
+    items = [
+        {"method": "get", "path": "/test"},
+        {"method": "get", "path": "/test/abc"},
+        {"method": "post", "path": "/test", "body": {"foo": "bar"}},
+        {"method": "get", "path": "/test-async"},
+        {"method": "delete", "path": "/test"},
+        {"method": "get", "path": "/does-not-exist"},
+        {"path": "/test"},
+    ]
+
+    response = await _batch_endpoint(app)(_batch_request(app, items))
+
+    assert json.loads(response.body) == [
+        {"status": 200, "body": {"foo": "bar"}},
+        {"status": 200, "body": {"foo": "abc"}},
+        {"status": 204, "body": None},
+        {"status": 200, "body": {"baz": 123}},
+        {"status": 405, "body": "Method Not Allowed"},
+        {"status": 404, "body": "Not Found"},
+        {"status": 400, "body": "Invalid batch item."},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_limits_number_of_concurrent_operations(spec_dict):
+    app = Application(spec_dict, batch_path="/batch", batch_concurrency=2)
+    running = 0
+    max_running = 0
+
+    @app.endpoint("dummyTestEndpointCoro")
+    async def endpoint(request):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"baz": 1}
+
+    items = [{"method": "get", "path": "/test-async"}] * 5
+    response = await _batch_endpoint(app)(_batch_request(app, items))
+
+    assert [item["status"] for item in json.loads(response.body)] == [200] * 5
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_returns_undecodable_bodies_without_failing(spec_dict):
+    app = Application(spec_dict, batch_path="/batch", skip_response_validation=True)
+
+    @app.endpoint("dummyTestEndpoint")
+    def binary_endpoint(request):
+        return Response(b"\xff\xfe", media_type="application/octet-stream")
+
+    @app.endpoint("dummyTestEndpointCoro")
+    async def invalid_json_endpoint(request):
+        return Response(b"{not json", media_type="application/json")
+
+    items = [{"method": "get", "path": "/test"}, {"method": "get", "path": "/test-async"}]
+    response = await _batch_endpoint(app)(_batch_request(app, items))
+
+    assert json.loads(response.body) == [
+        {"status": 200, "body": "//4=", "encoding": "base64"},
+        {"status": 200, "body": "{not json"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_too_many_items(spec_dict, config):
+    app = Application(
+        spec_dict, module=config.endpoint_base, batch_path="/batch", batch_max_items=2
+    )
+    items = [{"method": "get", "path": "/test"}] * 3
+
+    with pytest.raises(HTTPException) as ex:
+        await _batch_endpoint(app)(_batch_request(app, items))
+    assert ex.value.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_batch_items_do_not_share_request_state(spec_dict):
+    app = Application(spec_dict, batch_path="/batch")
+
+    @app.endpoint("dummyTestEndpointWithArgument")
+    async def endpoint(request):
+        request.state.user = request.path_params["test_arg"]
+        await asyncio.sleep(0.01)
+        return {"foo": request.state.user}
+
+    items = [{"method": "get", "path": "/test/a"}, {"method": "get", "path": "/test/b"}]
+    response = await _batch_endpoint(app)(_batch_request(app, items))
+
+    assert [item["body"] for item in json.loads(response.body)] == [{"foo": "a"}, {"foo": "b"}]
@@ -0,0 +1,81 @@
+import cProfile
+import pstats
+
+import pytest
+
+from pyapi.server import Application
+from pyapi.server.profiling import RequestProfiler, collapse_stacks
+
+SECRET = "s3cret"
+
+
+def test_profiler_selects_requests_with_secret_header(tmp_path, make_request):
+    profiler = RequestProfiler(tmp_path, header="X-Profile", secret=SECRET)
+    assert profiler.should_profile(make_request(headers={"X-Profile": SECRET}), "foo")
+    assert not profiler.should_profile(make_request(headers={"X-Profile": "wrong"}), "foo")
+    assert not profiler.should_profile(make_request(), "foo")
+
+
+def test_profiler_ignores_non_ascii_header_value(tmp_path, make_request):
+    profiler = RequestProfiler(tmp_path, header="X-Profile", secret=SECRET)
+    request = make_request(headers={"X-Profile": "s\xe9cret"})
+    assert not profiler.should_profile(request, "foo")
+
+
+def test_profiler_samples_only_selected_operations(tmp_path, make_request):
+    profiler = RequestProfiler(tmp_path, sample_rate=1.0, operation_ids=["foo"])
+    assert profiler.should_profile(make_request(), "foo")
+    assert not profiler.should_profile(make_request(), "bar")
+
+
+@pytest.mark.asyncio
+async def test_profiler_aggregates_statistics_per_operation(tmp_path):
+    profiler = RequestProfiler(tmp_path, trace_memory=True)
+    for _ in range(2):
+        async with profiler.profile("foo"):
+            sum(range(1000))
+
+    assert len(list((tmp_path / "foo").glob("*.prof"))) == 2
+    assert len(list((tmp_path / "foo").glob("*.tracemalloc"))) == 2
+    assert profiler.get_stats("foo").total_calls > 0
+    assert profiler.get_stats("bar") is None
+    with pytest.raises(ValueError):
+        profiler.dump_stats("bar", tmp_path / "bar.prof")
+
+
+def test_collapse_stacks_builds_semicolon_separated_stacks():
+    def inner():
+        return sum(range(100_000))
+
+    def outer():
+        return inner()
+
+    profile = cProfile.Profile()
+    profile.runcall(outer)
+    stacks = collapse_stacks(pstats.Stats(profile))
+
+    assert any("outer" in stack and "inner" in stack for stack in stacks)
+    assert all(isinstance(value, int) and value > 0 for value in stacks.values())
+
+
+@pytest.mark.asyncio
+async def test_application_profiles_requests_and_exports_results(
+    spec_dict, config, tmp_path, make_request
+):
+    profiler = RequestProfiler(tmp_path / "profiles", secret=SECRET)
+    app = Application(spec_dict, module=config.endpoint_base, profiler=profiler)
+    route = next(route for route in app.routes if route.path == "/test")
+
+    await route.endpoint(make_request())
+    assert profiler.get_stats("dummyTestEndpoint") is None
+
+    response = await route.endpoint(make_request(headers={"X-Profile": SECRET}))
+    assert response.status_code == 200
+    assert len(list((tmp_path / "profiles" / "dummyTestEndpoint").glob("*.prof"))) == 1
+
+    profiler.dump_stats("dummyTestEndpoint", tmp_path / "stats.prof")
+    profiler.dump_collapsed("dummyTestEndpoint", tmp_path / "stacks.txt")
+    assert pstats.Stats(str(tmp_path / "stats.prof")).total_calls > 0
+    lines = (tmp_path / "stacks.txt").read_text().splitlines()
+    assert lines
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
@@ -0,0 +1,84 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from starlette.exceptions import HTTPException
+
+from pyapi.server import Application
+from pyapi.server.rejection import PROBLEM_MEDIA_TYPE, Rejections
+
+
+def _endpoint(spec_dict, config, **kwargs):
+    spec_dict["paths"]["/test"]["get"]["parameters"] = [
+        {"name": "foo", "in": "query", "required": True, "schema": {"type": "string"}},
+        {"name": "bar", "in": "query", "schema": {"type": "integer", "maximum": 3}},
+    ]
+    app = Application(spec_dict, module=config.endpoint_base, **kwargs)
+    route = next(
+        route for route in app.routes if route.path == "/test" and "GET" in route.methods
+    )
+    return app, route.endpoint
+
+
+@pytest.mark.asyncio
+async def test_invalid_request_is_rejected_with_problem_listing_errors(
+    spec_dict, config, make_request
+):
+    app, endpoint = _endpoint(spec_dict, config)
+
+    response = await endpoint(make_request(query_string=b"bar=5"))
+
+    assert response.status_code == 400
+    assert response.media_type == PROBLEM_MEDIA_TYPE
+    assert json.loads(response.body) == {
+        "title": "Bad Request",
+        "status": 400,
+        "detail": "Bad request",
+        "errors": [
+            {"title": "Missing required query parameter: foo"},
+            {
+                "title": "Invalid query parameter: bar",
+                "detail": "5 is greater than the maximum of 3",
+                "pointer": "",
+            },
+        ],
+    }
+    assert app.rejections.counts == {("dummyTestEndpoint", 400): 1}
+
+
+@pytest.mark.asyncio
+async def test_errors_are_listed_only_within_rate_limit(spec_dict, config, make_request):
+    app, endpoint = _endpoint(
+        spec_dict, config, rejections=Rejections(max_errors=1, error_rate=2)
+    )
+
+    bodies = [
+        json.loads((await endpoint(make_request(query_string=b"bar=5"))).body) for _ in range(3)
+    ]
+
+    assert [len(body.get("errors", [])) for body in bodies] == [1, 1, 0]
+    assert bodies[2] == {"title": "Bad Request", "status": 400, "detail": "Bad request"}
+    assert app.rejections.counts == {("dummyTestEndpoint", 400): 3}
+
+
+def test_rejections_without_errors_reuse_prebuilt_body():
+    rejections = Rejections()
+
+    first = rejections.reject("foo", HTTPStatus.FORBIDDEN)
+    second = rejections.reject("foo", HTTPStatus.FORBIDDEN)
+
+    assert first.body is second.body
+    assert json.loads(first.body)["detail"] == "Invalid security."
+    assert rejections.counts == {("foo", 403): 2}
+
+
+@pytest.mark.asyncio
+async def test_invalid_request_raises_http_error_in_debug_mode(spec_dict, config, make_request):
+    app, endpoint = _endpoint(spec_dict, config, debug=True)
+
+    with pytest.raises(HTTPException) as ex:
+        await endpoint(make_request())
+
+    assert ex.value.status_code == 400
+    assert ex.value.__cause__ is not None
+    assert app.rejections.counts == {("dummyTestEndpoint", 400): 1}
@@ -0,0 +1,164 @@
+import asyncio
+import copy
+import json
+import threading
+
+import pytest
+
+import pyapi.server
+from pyapi.server import Application
+
+
+def _routes_by_name(app):
+    return {route.name: route for route in app.routes}
+
+
+def test_reload_with_unchanged_spec_keeps_all_routes(spec_dict, config):
+    app = Application(spec_dict, module=config.endpoint_base)
+    routes = list(app.routes)
+
+    assert app.reload(copy.deepcopy(spec_dict)) == set()
+    assert all(new is old for new, old in zip(app.routes, routes, strict=True))
+
+
+def test_reload_recompiles_only_changed_operations(spec_dict, config):
+    app = Application(spec_dict, module=config.endpoint_base)
+    routes = list(app.routes)
+
+    new_spec = copy.deepcopy(spec_dict)
+    new_spec["paths"]["/test-async"]["get"]["summary"] = "Changed."
+    assert app.reload(new_spec) == {"dummyTestEndpointCoro"}
+
+    assert [route.path for route in app.routes] == [route.path for route in routes]
+    for new, old in zip(app.routes, routes, strict=True):
+        if new.name == "dummyTestEndpointCoro":
+            assert new is not old
+            assert new.endpoint.__wrapped__ is old.endpoint.__wrapped__
+        else:
+            assert new is old
+
+
+def test_reload_adds_and_removes_operations(spec_dict, config):
+    app = Application(spec_dict, module=config.endpoint_base)
+
+    new_spec = copy.deepcopy(spec_dict)
+    del new_spec["paths"]["/test-async"]
+    new_spec["paths"]["/test-nothing"] = {
+        "get": {
+            "operationId": "endpointReturningNothing",
+            "responses": {"204": {"description": "no content"}},
+        }
+    }
+    assert app.reload(new_spec) == {"dummyTestEndpointCoro", "endpointReturningNothing"}
+
+    routes = _routes_by_name(app)
+    assert "dummyTestEndpointCoro" not in routes
+    assert routes["endpointReturningNothing"].path == "/test-nothing"
+
+
+def test_reload_recompiles_all_operations_when_components_change(spec_dict, config):
+    app = Application(spec_dict, module=config.endpoint_base)
+    routes = list(app.routes)
+
+    new_spec = copy.deepcopy(spec_dict)
+    new_spec["components"]["schemas"]["Thing"]["properties"]["bar"] = {"type": "string"}
+    assert app.reload(new_spec) == set(app._operations)
+    assert all(new is not old for new, old in zip(app.routes, routes, strict=True))
+
+
+def test_reload_leaves_app_intact_if_endpoint_function_is_missing(spec_dict, config):
+    app = Application(spec_dict, module=config.endpoint_base)
+    spec, routes = app.spec, list(app.routes)
+
+    new_spec = copy.deepcopy(spec_dict)
+    new_spec["paths"]["/test"]["get"]["operationId"] = "fooBar"
+    with pytest.raises(RuntimeError):
+        app.reload(new_spec)
+
+    assert app.spec is spec
+    assert app.routes == routes
+
+
+def test_reload_leaves_app_intact_if_security_handler_scheme_is_missing(spec_dict, config):
+    spec_dict["components"]["securitySchemes"] = {
+        "api_key": {"type": "apiKey", "name": "X-API-Key", "in": "header"}
+    }
+    app = Application(
+        spec_dict,
+        module=config.endpoint_base,
+        security_handlers={"api_key": lambda credential, scopes: True},
+    )
+    spec, routes, security = app.spec, list(app.routes), app.security_handlers
+
+    new_spec = copy.deepcopy(spec_dict)
+    del new_spec["components"]["securitySchemes"]
+    new_spec["paths"]["/test"]["get"]["summary"] = "Changed."
+    with pytest.raises(ValueError, match="Unknown security schemes"):
+        app.reload(new_spec)
+
+    assert app.spec is spec
+    assert app.routes == routes
+    assert app.security_handlers is security
+    assert app.reload(copy.deepcopy(spec_dict)) == set()
+
+
+def test_reload_keeps_individually_set_endpoints(spec_dict):
+    app = Application(spec_dict)
+
+    @app.endpoint
+    def dummy_test_endpoint(request):
+        return {}
+
+    new_spec = copy.deepcopy(spec_dict)
+    new_spec["paths"]["/test"]["get"]["summary"] = "Changed."
+    app.reload(new_spec)
+
+    (route,) = app.routes
+    assert route.endpoint.__wrapped__ is dummy_test_endpoint
+
+
+@pytest.mark.asyncio
+async def test_watch_reloads_spec_when_file_changes(spec_dict, config, tmp_path):
+    spec_path = tmp_path / "openapi.json"
+    spec_path.write_text(json.dumps(spec_dict))
+    app = Application.from_file(spec_path, module=config.endpoint_base)
+
+    task = asyncio.create_task(app.watch(spec_path, interval=0.01))
+    await asyncio.sleep(0.05)
+    del spec_dict["paths"]["/test-async"]
+    spec_path.write_text(json.dumps(spec_dict))
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if "dummyTestEndpointCoro" not in _routes_by_name(app):
+            break
+    task.cancel()
+
+    assert "dummyTestEndpointCoro" not in _routes_by_name(app)
+
+
+@pytest.mark.asyncio
+async def test_watch_compiles_spec_outside_event_loop(spec_dict, config, tmp_path, monkeypatch):
+    spec_path = tmp_path / "openapi.json"
+    spec_path.write_text(json.dumps(spec_dict))
+    app = Application.from_file(spec_path, module=config.endpoint_base)
+    threads = []
+
+    def spec_validators(*args):
+        threads.append(threading.get_ident())
+        return validators_class(*args)
+
+    validators_class = pyapi.server.SpecValidators
+    monkeypatch.setattr(pyapi.server, "SpecValidators", spec_validators)
+
+    task = asyncio.create_task(app.watch(spec_path, interval=0.01))
+    await asyncio.sleep(0.05)
+    spec_dict["paths"]["/test"]["get"]["summary"] = "Changed."
+    spec_path.write_text(json.dumps(spec_dict))
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if threads:
+            break
+    task.cancel()
+
+    assert threads
+    assert threading.get_ident() not in threads
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from pyapi.server import Application
+from pyapi.server.security import CredentialCache, SecurityHandlers, get_credential
+
+SCHEMES = {
+    "api_key": {"type": "apiKey", "name": "X-API-Key", "in": "header"},
+    "bearer": {"type": "http", "scheme": "bearer"},
+}
+
+
+@pytest.fixture
+def secured_spec_dict(spec_dict):
+    spec_dict.setdefault("components", {})["securitySchemes"] = SCHEMES
+    spec_dict["paths"]["/test"]["get"]["security"] = [{"api_key": []}, {"bearer": []}]
+    spec_dict["paths"]["/test"]["get"]["parameters"] = [
+        {"name": "X-API-Key", "in": "header", "schema": {"type": "string"}}
+    ]
+    return spec_dict
+
+
+def test_get_credential_extracts_api_key_and_bearer_token(make_request):
+    request = make_request(headers={"X-API-Key": "secret", "Authorization": "Bearer token"})
+    assert get_credential(request, SCHEMES["api_key"]) == "secret"
+    assert get_credential(request, SCHEMES["bearer"]) == "token"
+    assert get_credential(make_request(), SCHEMES["bearer"]) is None
+
+
+def test_credential_cache_expires_results(monkeypatch):
+    from pyapi.server import security
+
+    now = 100.0
+    monkeypatch.setattr(security, "monotonic", lambda: now)
+    cache = CredentialCache(ttl=10, negative_ttl=1)
+    cache.set(("a",), True)
+    cache.set(("b",), False)
+    now = 105.0
+    assert cache.get(("a",)) is True
+    assert cache.get(("b",)) is None
+
+
+def test_credential_cache_evicts_oldest_entry():
+    cache = CredentialCache(maxsize=2)
+    for key in ("a", "b", "c"):
+        cache.set((key,), True)
+    assert cache.get(("a",)) is None
+    assert cache.get(("c",)) is True
+
+
+def test_security_handlers_reject_unknown_scheme():
+    with pytest.raises(ValueError):
+        SecurityHandlers(SCHEMES, {"foo": lambda credential, scopes: True})
+
+
+@pytest.mark.asyncio
+async def test_security_handlers_cache_results_per_credential(make_request):
+    calls = []
+
+    async def check_key(credential, scopes):
+        calls.append(credential)
+        return credential == "secret"
+
+    handlers = SecurityHandlers(SCHEMES, {"api_key": check_key})
+    requirements = [{"api_key": []}]
+    assert await handlers.check(make_request(headers={"X-API-Key": "secret"}), requirements)
+    assert await handlers.check(make_request(headers={"X-API-Key": "secret"}), requirements)
+    assert not await handlers.check(make_request(headers={"X-API-Key": "wrong"}), requirements)
+    assert not await handlers.check(make_request(headers={"X-API-Key": "wrong"}), requirements)
+    assert calls == ["secret", "wrong"]
+
+
+@pytest.mark.asyncio
+async def test_security_handlers_evaluate_alternatives_concurrently(make_request):
+    started = []
+
+    async def slow_key(credential, scopes):
+        started.append("api_key")
+        await asyncio.sleep(10)
+        return False
+
+    async def fast_token(credential, scopes):
+        started.append("bearer")
+        return True
+
+    handlers = SecurityHandlers(SCHEMES, {"api_key": slow_key, "bearer": fast_token})
+    request = make_request(headers={"X-API-Key": "key", "Authorization": "Bearer token"})
+    result = await asyncio.wait_for(
+        handlers.check(request, [{"api_key": []}, {"bearer": []}]), timeout=1
+    )
+    assert result is True
+    assert sorted(started) == ["api_key", "bearer"]
+
+
+@pytest.mark.asyncio
+async def test_security_handler_failure_rejects_only_its_alternative(caplog, make_request):
+    def failing_key(credential, scopes):
+        raise ConnectionError
+
+    async def slow_token(credential, scopes):
+        await asyncio.sleep(0.01)
+        return True
+
+    handlers = SecurityHandlers(SCHEMES, {"api_key": failing_key, "bearer": slow_token})
+    request = make_request(headers={"X-API-Key": "key", "Authorization": "Bearer token"})
+
+    assert await handlers.check(request, [{"api_key": []}, {"bearer": []}]) is True
+    assert await handlers.check(request, [{"api_key": []}]) is False
+    assert "Security handler for api_key failed" in caplog.text
+    assert handlers.cache.get(("api_key", "key", ())) is None
+
+
+@pytest.mark.asyncio
+async def test_application_rejects_request_failing_security_handler(
+    secured_spec_dict, config, make_request
+):
+    app = Application(
+        secured_spec_dict,
+        module=config.endpoint_base,
+        security_handlers={"api_key": lambda credential, scopes: credential == "secret"},
+    )
+    route = next(route for route in app.routes if route.path == "/test")
+
+    response = await route.endpoint(make_request(headers={"X-API-Key": "wrong"}))
+    assert response.status_code == 403
+
+    response = await route.endpoint(make_request(headers={"X-API-Key": "secret"}))
+    assert response.status_code == 200
@@ -0,0 +1,119 @@
+import json
+import threading
+
+import pytest
+
+from pyapi.server import Application
+from pyapi.server.tracing import (
+    NULL_TRACE,
+    InMemoryExporter,
+    JSONLinesExporter,
+    Span,
+    Tracer,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+def _route(app, path):
+    return next(route for route in app.routes if route.path == path)
+
+
+def test_trace_continues_incoming_trace_context(make_request):
+    tracer = Tracer()
+    trace = tracer.start_trace(
+        make_request(headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}), "foo"
+    )
+    assert trace.root.trace_id == TRACE_ID
+    assert trace.root.parent_id == PARENT_ID
+
+    trace = tracer.start_trace(make_request(headers={"traceparent": "invalid"}), "foo")
+    assert len(trace.root.trace_id) == 32
+    assert trace.root.parent_id is None
+
+
+def test_in_memory_exporter_keeps_most_recent_spans(make_request):
+    exporter = InMemoryExporter(maxlen=2)
+    tracer = Tracer([exporter])
+    for _ in range(2):
+        with tracer.start_trace(make_request(), "foo") as trace, trace.span("step"):
+            pass
+    assert [span.name for span in exporter.spans] == ["request", "step"]
+
+
+def test_null_trace_records_nothing():
+    with NULL_TRACE, NULL_TRACE.span("step") as span:
+        assert span is None
+
+
+@pytest.mark.asyncio
+async def test_application_records_request_lifecycle_spans(spec_dict, config, make_request):
+    exporter = InMemoryExporter()
+    app = Application(spec_dict, module=config.endpoint_base, tracer=Tracer([exporter]))
+
+    headers = {"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}
+    response = await _route(app, "/test").endpoint(make_request(headers=headers))
+
+    root, *children = exporter.spans
+    assert [span.name for span in children] == [
+        "validate_request",
+        "handler",
+        "serialize",
+        "validate_response",
+    ]
+    assert root.trace_id == TRACE_ID
+    assert root.parent_id == PARENT_ID
+    assert root.attributes["operation_id"] == "dummyTestEndpoint"
+    assert root.attributes["outcome"] == "success"
+    assert root.attributes["status_code"] == 200
+    assert all(span.parent_id == root.span_id for span in children)
+    assert all(root.start <= span.start <= span.end <= root.end for span in children)
+    assert response.headers["traceparent"] == f"00-{TRACE_ID}-{root.span_id}-01"
+
+
+@pytest.mark.asyncio
+async def test_application_records_outcome_of_rejected_request(
+    spec_dict, config, tmp_path, make_request
+):
+    spec_dict["paths"]["/test"]["get"]["parameters"] = [
+        {"name": "foo", "in": "query", "required": True, "schema": {"type": "string"}}
+    ]
+    path = tmp_path / "spans.jsonl"
+    exporter = JSONLinesExporter(path)
+    app = Application(spec_dict, module=config.endpoint_base, tracer=Tracer([exporter]))
+
+    response = await _route(app, "/test").endpoint(make_request())
+    assert response.status_code == 400
+    exporter.close()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [span["name"] for span in spans] == ["request", "validate_request"]
+    assert spans[0]["attributes"]["outcome"] == "error"
+    assert spans[0]["attributes"]["status_code"] == 400
+    assert spans[0]["duration"] == spans[0]["end"] - spans[0]["start"]
+
+
+def test_json_lines_exporter_writes_spans_in_background_thread(tmp_path, monkeypatch):
+    threads = []
+    to_dict = Span.to_dict
+
+    def spy(span):
+        threads.append(threading.get_ident())
+        return to_dict(span)
+
+    monkeypatch.setattr(Span, "to_dict", spy)
+    path = tmp_path / "spans.jsonl"
+    exporter = JSONLinesExporter(path)
+    spans = [Span("request", TRACE_ID, PARENT_ID, None, 1, 2)]
+
+    exporter.export(spans)
+    exporter.export(spans)
+    exporter.flush()
+
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == [
+        "request"
+    ] * 2
+    assert threading.get_ident() not in threads
+    exporter.close()
+    assert not exporter._thread.is_alive()
@@ -0,0 +1,186 @@
+import pytest
+from starlette.responses import Response
+
+from pyapi.server import Application, validation
+
+BOUNDARY = "XyZ"
+
+
+@pytest.fixture
+def upload_spec_dict(spec_dict):
+    spec_dict["paths"]["/upload"] = {
+        "post": {
+            "operationId": "uploadFile",
+            "requestBody": {
+                "required": True,
+                "content": {
+                    "application/octet-stream": {
+                        "schema": {"type": "string", "format": "binary"}
+                    },
+                    "multipart/form-data": {
+                        "schema": {
+                            "type": "object",
+                            "required": ["file", "meta"],
+                            "properties": {
+                                "file": {"type": "string", "format": "binary"},
+                                "meta": {"type": "string", "maxLength": 3},
+                            },
+                        }
+                    },
+                },
+            },
+            "responses": {"204": {"description": "no content"}},
+        }
+    }
+    return spec_dict
+
+
+@pytest.fixture
+def upload_request(make_request):
+    def upload_request(content_type, chunks, content_length=None):
+        headers = {"Content-Type": content_type}
+        if content_length is not None:
+            headers["Content-Length"] = str(content_length)
+        return make_request("POST", "/upload", headers=headers, body=chunks)
+
+    return upload_request
+
+
+def _multipart(meta, file_content):
+    return (
+        (
+            f"--{BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="meta"\r\n\r\n'
+            f"{meta}\r\n"
+            f"--{BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="pet.bin"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        + file_content
+        + f"\r\n--{BOUNDARY}--\r\n".encode()
+    )
+
+
+def _app(spec_dict, received, **kwargs):
+    app = Application(spec_dict, **kwargs)
+
+    @app.endpoint
+    async def upload_file(request):
+        if request.headers["content-type"].startswith("multipart"):
+            form = await request.form()
+            received["meta"] = form["meta"]
+            received["file"] = await form["file"].read()
+        elif hasattr(request.state, "upload"):
+            received["file"] = await request.state.upload.read()
+        else:
+            received["file"] = await request.body()
+        return Response(status_code=204)
+
+    return next(route for route in app.routes if route.path == "/upload").endpoint
+
+
+@pytest.mark.asyncio
+async def test_large_binary_body_is_spooled_and_passed_to_endpoint(
+    upload_spec_dict, upload_request
+):
+    received = {}
+    endpoint = _app(upload_spec_dict, received, spool_threshold=16)
+
+    request = upload_request("application/octet-stream", [b"x" * 10] * 5)
+    response = await endpoint(request)
+
+    assert response.status_code == 204
+    assert received["file"] == b"x" * 50
+    assert request.state.upload.size == 50
+
+
+@pytest.mark.asyncio
+async def test_small_binary_body_with_known_length_is_read_into_memory(
+    upload_spec_dict, upload_request
+):
+    received = {}
+    endpoint = _app(upload_spec_dict, received, spool_threshold=16)
+
+    request = upload_request("application/octet-stream", [b"abc"], content_length=3)
+    response = await endpoint(request)
+
+    assert response.status_code == 204
+    assert received["file"] == b"abc"
+    assert not hasattr(request.state, "upload")
+
+
+@pytest.mark.asyncio
+async def test_multipart_body_is_validated_without_large_files(
+    upload_spec_dict, upload_request
+):
+    pytest.importorskip("python_multipart")
+    received = {}
+    endpoint = _app(upload_spec_dict, received, spool_threshold=16)
+    content_type = f"multipart/form-data; boundary={BOUNDARY}"
+
+    body = _multipart("abc", b"\x01" * 100)
+    response = await endpoint(upload_request(content_type, [body[:50], body[50:]]))
+    assert response.status_code == 204
+    assert received == {"meta": "abc", "file": b"\x01" * 100}
+
+    response = await endpoint(upload_request(content_type, [_multipart("abcd", b"\x01" * 100)]))
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bodies_are_read_into_memory_if_spooling_is_disabled(
+    upload_spec_dict, upload_request
+):
+    received = {}
+    endpoint = _app(upload_spec_dict, received, spool_threshold=None)
+
+    request = upload_request("application/octet-stream", [b"x" * 10] * 5)
+    response = await endpoint(request)
+
+    assert response.status_code == 204
+    assert received["file"] == b"x" * 50
+
+
+@pytest.mark.asyncio
+async def test_small_bodies_remain_available_to_endpoint(upload_spec_dict, upload_request):
+    pytest.importorskip("python_multipart")
+    app = Application(upload_spec_dict, spool_threshold=1024)
+    received = []
+
+    @app.endpoint
+    async def upload_file(request):
+        received.append(await request.body())
+        return Response(status_code=204)
+
+    endpoint = next(route for route in app.routes if route.path == "/upload").endpoint
+    form = _multipart("abc", b"\x01" * 5)
+    content_type = f"multipart/form-data; boundary={BOUNDARY}"
+
+    response = await endpoint(upload_request(content_type, [form], content_length=len(form)))
+    assert response.status_code == 204
+    response = await endpoint(upload_request("application/octet-stream", [b"abc", b"def"]))
+    assert response.status_code == 204
+    assert received == [form, b"abcdef"]
+
+
+def test_spooling_is_disabled_by_default(spec_dict):
+    assert Application(spec_dict).spool_threshold is None
+
+
+@pytest.mark.asyncio
+async def test_multipart_body_is_read_into_memory_with_warning_without_parser(
+    upload_spec_dict, upload_request, monkeypatch
+):
+    pytest.importorskip("python_multipart")
+    monkeypatch.setattr(validation, "parse_options_header", None)
+    received = {}
+    endpoint = _app(upload_spec_dict, received, spool_threshold=16)
+    content_type = f"multipart/form-data; boundary={BOUNDARY}"
+
+    with pytest.warns(RuntimeWarning, match="python-multipart is not installed"):
+        response = await endpoint(
+            upload_request(content_type, [_multipart("abc", b"\x01" * 100)])
+        )
+
+    assert response.status_code == 204
+    assert received == {"meta": "abc", "file": b"\x01" * 100}
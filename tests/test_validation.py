@@ -0,0 +1,78 @@
+import pytest
+from openapi_core.validation.request.validators import BaseRequestValidator
+
+from pyapi.server import Application
+from pyapi.server.validation import OpenAPIRequest
+
+
+def test_request_parameters_are_taken_only_from_given_locations(make_request):
+    request = make_request(query_string=b"foo=bar", headers={"X-Foo": "baz"})
+
+    parameters = OpenAPIRequest(request, locations={"header"}).parameters
+    assert dict(parameters.query) == {}
+    assert parameters.header["X-Foo"] == "baz"
+
+    parameters = OpenAPIRequest(request).parameters
+    assert parameters.query["foo"] == "bar"
+
+
+def test_request_without_body_is_not_read(make_request):
+    openapi_request = OpenAPIRequest(make_request(), has_body=False)
+    assert openapi_request.body is None
+
+
+@pytest.mark.asyncio
+async def test_endpoint_without_request_body_does_not_read_body(
+    spec_dict, config, make_request
+):
+    app = Application(spec_dict, module=config.endpoint_base)
+    route = next(route for route in app.routes if route.path == "/test")
+
+    response = await route.endpoint(make_request())
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_request_with_missing_credentials_is_rejected_before_reading_body(
+    spec_dict, config, make_request
+):
+    spec_dict["components"]["securitySchemes"] = {
+        "api_key": {"type": "apiKey", "name": "X-API-Key", "in": "header"}
+    }
+    spec_dict["paths"]["/test"]["post"]["security"] = [{"api_key": []}]
+    app = Application(spec_dict, module=config.endpoint_base)
+    route = next(
+        route for route in app.routes if route.path == "/test" and "POST" in route.methods
+    )
+
+    response = await route.endpoint(make_request("POST"))
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_security_is_validated_once_for_request_with_body(
+    spec_dict, config, monkeypatch, make_request
+):
+    spec_dict["components"]["securitySchemes"] = {
+        "api_key": {"type": "apiKey", "name": "X-API-Key", "in": "header"}
+    }
+    spec_dict["paths"]["/test"]["post"]["security"] = [{"api_key": []}]
+    app = Application(spec_dict, module=config.endpoint_base)
+    route = next(
+        route for route in app.routes if route.path == "/test" and "POST" in route.methods
+    )
+    calls = []
+    get_security_value = BaseRequestValidator._get_security_value
+
+    def spy(self, parameters, scheme_name):
+        calls.append(scheme_name)
+        return get_security_value(self, parameters, scheme_name)
+
+    monkeypatch.setattr(BaseRequestValidator, "_get_security_value", spy)
+
+    headers = {"X-API-Key": "key", "Content-Type": "application/json"}
+    request = make_request("POST", headers=headers, body=[b'{"foo": 1}'])
+    response = await route.endpoint(request)
+
+    assert response.status_code == 400
+    assert calls == ["api_key"]